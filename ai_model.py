@@ -1,29 +1,71 @@
-from models import SentimentModel, ImageModel, TextToImageModel
+import os
+from collections import OrderedDict
+from model_registry import get_model, release_model
 
 class Logging:
     def log(self, message):
         print(f"Log: {message}")
 
 class AIModel(Logging):
+    # text_to_image writes its output to disk, so a cached message could
+    # point at an image that a later prompt has since overwritten.
+    _UNCACHED_TYPES = {'text_to_image'}
+    # Entries can be batches of 100 KB texts, so keep the cache small.
+    _CACHE_SIZE = 32
+
     def __init__(self, model_type):
         self.model_type = model_type
         self.model_instance = self._create_model(model_type)
+        self._pred_cache = OrderedDict()
 
     def _create_model(self, typ):
-        if typ == 'sentiment':
-            return SentimentModel()
-        elif typ == 'image':
-            return ImageModel()
-        elif typ == 'text_to_image':
-            return TextToImageModel()
-        return None
+        return get_model(typ)
 
     def load(self):
         if self.model_instance:
             self.model_instance.load()
             self.log(f"{self.model_type} model loaded")
 
-    def predict(self, input_data):
+    def is_loaded(self):
+        return bool(self.model_instance) and self.model_instance.pipe is not None
+
+    def unload(self):
         if self.model_instance:
+            release_model(self.model_type)
+            self.model_instance.unload()
+            self._pred_cache.clear()
+            self.log(f"{self.model_type} model unloaded")
+
+    def predict(self, input_data):
+        if not self.model_instance:
+            return "No model selected"
+        key = self._cache_key(input_data)
+        if key is None:
             return self.model_instance.predict(input_data)
-        return "No model selected"
+        if key in self._pred_cache:
+            self._pred_cache.move_to_end(key)
+            return self._pred_cache[key]
+        result = self.model_instance.predict(input_data)
+        self._pred_cache[key] = result
+        if len(self._pred_cache) > self._CACHE_SIZE:
+            self._pred_cache.popitem(last=False)
+        return result
+
+    def _cache_key(self, input_data):
+        if self.model_type in self._UNCACHED_TYPES:
+            return None
+        # Scalar and list inputs return a label and a list of labels, so
+        # 'x' and ['x'] must not share a key.
+        single = not isinstance(input_data, list)
+        items = [input_data] if single else input_data
+        if not all(isinstance(item, str) for item in items):
+            return None
+        if self.model_type == 'image':
+            # Image files such as generated_image.png are rewritten in place,
+            # so the path alone does not identify the image.
+            try:
+                stats = [os.stat(path) for path in items]
+            except OSError:
+                return None
+            items = [(path, st.st_mtime_ns, st.st_size) for path, st in zip(items, stats)]
+        return (single, tuple(items))
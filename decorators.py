@@ -1,4 +1,7 @@
+import functools
+
 def button_click_decorator(func):
+    @functools.wraps(func)
     def wrapper(self, *args, **kwargs):
         print("Button clicked!")
         return func(self, *args, **kwargs)
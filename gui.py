@@ -1,18 +1,42 @@
+import os
 import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from tkinter import ttk, scrolledtext, filedialog, messagebox
-from model_info import ModelInfo
-from oop_explainer import OOPExplainer
+from model_info import get_info
+from oop_explainer import OOP_EXPLANATIONS
 from ai_model import AIModel
+from models import GenerationCancelled
 from decorators import button_click_decorator
 
+_MODELS = (
+    ('Sentiment Analysis', 'sentiment'),
+    ('Image Classification', 'image'),
+    ('Text to Image', 'text_to_image'),
+)
+
+_MODEL_TO_INPUT = {'image': 'Image', 'sentiment': 'Text', 'text_to_image': 'Text'}
+
+# Far beyond what the models' 512-token windows can use.
+_MAX_TEXT_CHARS = 100_000
+
+def _set_text(widget, text):
+    # One Tk call instead of delete + insert, and no empty intermediate state.
+    widget.replace("1.0", tk.END, text)
+
 class AIApp:
     def __init__(self, root):
         self.root = root
         self.root.title("AI Model GUI with OOP")
-        self.model_info = ModelInfo()
-        self.explainer = OOPExplainer()
         self.current_model = None
+        self._model_cache = {}
         self.input_data = None
+        self.input_names = []
+        self._cancel_event = None
+        self._progress_step = 0
+        self._text_load = None
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="ai-worker")
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         self.setup_ui()
 
     def setup_ui(self):
@@ -25,12 +49,23 @@ class AIApp:
 
         ttk.Label(self.root, text="Select Model:").pack(pady=5)
         self.model_var = tk.StringVar(value="sentiment")
-        models = [('Sentiment Analysis', 'sentiment'), ('Image Classification', 'image'), ('Text to Image', 'text_to_image')]
-        for text, val in models:
+        for text, val in _MODELS:
             ttk.Radiobutton(self.root, text=text, variable=self.model_var, value=val, command=self.on_model_change).pack()
 
+        # Stable Diffusion and DistilBERT held together need roughly 5 GB of RAM.
+        self.unload_others = tk.BooleanVar(value=False)
+        ttk.Checkbutton(self.root, text="Unload other models before running", variable=self.unload_others).pack(pady=5)
+
+        ttk.Label(self.root, text="Text to Image Steps:").pack()
+        self.steps_var = tk.IntVar(value=20)
+        tk.Scale(self.root, from_=5, to=50, orient=tk.HORIZONTAL, variable=self.steps_var).pack()
+
         self.run_btn = ttk.Button(self.root, text="Run Model", command=self._decorated_run_model)
-        self.run_btn.pack(pady=10)
+        self.run_btn.pack(pady=(10, 5))
+        self.cancel_btn = ttk.Button(self.root, text="Cancel", command=self.on_cancel, state=tk.DISABLED)
+        self.cancel_btn.pack()
+        self.progress = ttk.Progressbar(self.root, length=300)
+        self.progress.pack(pady=5)
 
         ttk.Label(self.root, text="Output:").pack()
         self.output_text = scrolledtext.ScrolledText(self.root, height=5, width=50)
@@ -43,54 +78,171 @@ class AIApp:
         ttk.Label(self.root, text="OOP Explanations:").pack(pady=(20,5))
         self.exp_text = scrolledtext.ScrolledText(self.root, height=10, width=70)
         self.exp_text.pack()
-        self.exp_text.insert(tk.END, self.explainer.get_explanations())
+        self.exp_text.insert(tk.END, OOP_EXPLANATIONS)
 
         self.on_model_change()
 
     @button_click_decorator
     def _decorated_run_model(self):
         try:
-            if not self.input_data:
+            # input_data is a list; an empty text file shows up as ''.
+            if not self.input_data or not all(self.input_data):
                 messagebox.showerror("Error", "Please load an input file!")
                 return
             if not self.current_model:
                 messagebox.showerror("Error", "Please select a model!")
                 return
-            if (self.model_var.get() == 'image' and self.input_type.get() != 'Image') or \
-               (self.model_var.get() in ['sentiment', 'text_to_image'] and self.input_type.get() != 'Text'):
+            expected = _MODEL_TO_INPUT.get(self.model_var.get())
+            if expected and self.input_type.get() != expected:
                 messagebox.showerror("Error", "Input type does not match model requirements!")
                 return
-            self.current_model.load()
-            result = self.current_model.predict(self.input_data)
-            self.output_text.delete(1.0, tk.END)
-            self.output_text.insert(tk.END, str(result))
+            input_data = self.input_data
+            cancel_event = None
+            if self.model_var.get() == 'text_to_image':
+                if len(input_data) > 1:
+                    messagebox.showerror("Error", "Text to Image accepts a single input file!")
+                    return
+                input_data = input_data[0]
+                model = self.current_model.model_instance
+                model.num_inference_steps = self.steps_var.get()
+                model.on_step = self._on_step
+                cancel_event = model.cancel_event
+                cancel_event.clear()
+            if self.unload_others.get():
+                self._unload_other_models()
+            fut = self._executor.submit(self._run_pipeline, self.current_model, input_data)
+            self.run_btn.config(state=tk.DISABLED)
+            if cancel_event is not None:
+                self._cancel_event = cancel_event
+                self._progress_step = 0
+                self.progress.config(maximum=self.steps_var.get(), value=0)
+                self._refresh_progress(fut, self.current_model)
+            self._poll_future(fut, partial(self._on_run_done, names=self.input_names))
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to run model: {str(e)}")
+
+    @staticmethod
+    def _run_pipeline(model, input_data):
+        if not model.is_loaded():
+            model.load()
+        return model.predict(input_data)
+
+    def _on_run_done(self, fut, names):
+        self.run_btn.config(state=tk.NORMAL)
+        self.cancel_btn.config(state=tk.DISABLED)
+        self.progress.config(value=0)
+        self._cancel_event = None
+        try:
+            result = fut.result()
+            if isinstance(result, list):
+                result = "\n".join(f"{name}: {label}" for name, label in zip(names, result))
+            _set_text(self.output_text, str(result))
+        except GenerationCancelled as e:
+            _set_text(self.output_text, str(e))
         except Exception as e:
             messagebox.showerror("Error", f"Failed to run model: {str(e)}")
 
+    def _on_step(self, step):
+        # Runs on the worker thread; _refresh_progress copies it into the widget.
+        self._progress_step = step
+
+    def _refresh_progress(self, fut, model):
+        # Once the future is done, _on_run_done owns the widgets.
+        if fut.done():
+            return
+        self.progress.config(value=self._progress_step)
+        # The cancel event is only checked between denoising steps, so the
+        # button stays disabled through the (uninterruptible) first load.
+        if model.is_loaded():
+            self.cancel_btn.config(state=tk.NORMAL)
+        self.root.after(100, self._refresh_progress, fut, model)
+
+    def on_cancel(self):
+        if self._cancel_event:
+            self._cancel_event.set()
+
+    def on_close(self):
+        # Interpreter exit joins the worker threads, so stop a running
+        # generation and drop queued work before the window goes away.
+        self.on_cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.root.destroy()
+
     def on_model_change(self):
         model_type = self.model_var.get()
-        self.current_model = AIModel(model_type)
-        info = self.model_info.get_info(model_type)
-        self.info_text.delete(1.0, tk.END)
-        self.info_text.insert(tk.END, info)
+        self.current_model = self._model_cache.get(model_type)
+        if self.current_model is None:
+            self.current_model = self._model_cache[model_type] = AIModel(model_type)
+        info = get_info(model_type)
+        _set_text(self.info_text, info)
+
+    def _unload_other_models(self):
+        # Runs on the Tk thread while no run is in flight (run_btn is only
+        # enabled between runs), so no worker is using these pipelines.
+        for model_type, model in list(self._model_cache.items()):
+            if model is not self.current_model:
+                model.unload()
+                del self._model_cache[model_type]
 
     def on_type_change(self, event=None):
         self.input_data = None
-        self.output_text.delete(1.0, tk.END)
+        self.input_names = []
+        self._text_load = None
+        _set_text(self.output_text, "")
 
     def load_file(self):
         try:
             typ = self.input_type.get()
             if typ == 'Text':
-                file = filedialog.askopenfilename(filetypes=[("Text", "*.txt")])
-                if file:
-                    with open(file, 'r') as f:
-                        self.input_data = f.read()
+                files = filedialog.askopenfilenames(filetypes=[("Text", "*.txt")])
+                if files:
+                    # Drop the old input so Run cannot use it while this loads.
+                    self.input_data = None
+                    self.input_names = []
+                    fut = self._text_load = self._executor.submit(self._read_texts, files)
+                    self._poll_future(fut, partial(self._on_text_loaded, files=files))
             elif typ == 'Image':
-                file = filedialog.askopenfilename(filetypes=[("Image", "*.jpg *.png")])
-                if file:
-                    self.input_data = file
+                files = filedialog.askopenfilenames(filetypes=[("Image", "*.jpg *.png")])
+                if files:
+                    self.input_data = list(files)
+                    self.input_names = [os.path.basename(f) for f in files]
             else:
                 messagebox.showerror("Error", "Please select an input type!")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load file: {str(e)}")
+
+    @staticmethod
+    def _read_texts(paths):
+        texts, truncated = [], []
+        for path in paths:
+            # Text mode counts characters, so the cap never splits a
+            # multi-byte UTF-8 sequence. One extra char detects truncation.
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                text = f.read(_MAX_TEXT_CHARS + 1)
+            if len(text) > _MAX_TEXT_CHARS:
+                text = text[:_MAX_TEXT_CHARS]
+                truncated.append(os.path.basename(path))
+            texts.append(text)
+        return texts, truncated
+
+    def _on_text_loaded(self, fut, files):
+        # Ignore reads superseded by a newer Load File or an input type change.
+        if fut is not self._text_load:
+            return
+        self._text_load = None
+        try:
+            self.input_data, truncated = fut.result()
+            self.input_names = [os.path.basename(f) for f in files]
+            _set_text(self.output_text, "")
+            if truncated:
+                messagebox.showinfo("Info", f"Only the first {_MAX_TEXT_CHARS:,} characters were loaded from: {', '.join(truncated)}")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to load file: {str(e)}")
+
+    def _poll_future(self, fut, callback):
+        # Tk widgets must only be touched from the main loop, so completion
+        # is checked here rather than signalled from the worker thread.
+        if fut.done():
+            callback(fut)
+        else:
+            self.root.after(50, self._poll_future, fut, callback)
@@ -1,10 +1,17 @@
+from types import MappingProxyType
+
+MODEL_INFO = MappingProxyType({
+    'sentiment': 'DistilBERT for sentiment analysis.',
+    'image': 'CLIP for image classification.',
+    'text_to_image': 'Stable Diffusion v1-5 for text-to-image.'
+})
+
+def get_info(model_type):
+    return MODEL_INFO.get(model_type, 'No info available')
+
 class ModelInfo:
     def __init__(self):
-        self._info = {
-            'sentiment': 'DistilBERT for sentiment analysis.',
-            'image': 'CLIP for image classification.',
-            'text_to_image': 'Stable Diffusion v1-5 for text-to-image.'
-        }
+        self._info = MODEL_INFO
 
     def get_info(self, model_type):
         return self._info.get(model_type, 'No info available')
@@ -0,0 +1,27 @@
+import threading
+from models import SentimentModel, ImageModel, TextToImageModel
+
+_MODEL_CLASSES = {
+    'sentiment': SentimentModel,
+    'image': ImageModel,
+    'text_to_image': TextToImageModel,
+}
+
+_instances = {}
+_lock = threading.Lock()
+
+def get_model(model_type):
+    # One process-wide instance per type, so every AIModel wrapper (from any
+    # AIApp, or code outside the GUI) shares a single loaded pipeline.
+    # AIApp._model_cache sits above this and only keeps each type's AIModel,
+    # and with it that wrapper's prediction cache.
+    with _lock:
+        if model_type not in _instances:
+            model_class = _MODEL_CLASSES.get(model_type)
+            _instances[model_type] = model_class() if model_class else None
+        return _instances[model_type]
+
+def release_model(model_type):
+    # Evict the shared instance; the next get_model() builds a fresh one.
+    with _lock:
+        return _instances.pop(model_type, None)
@@ -1,24 +1,28 @@
 class OOPExplainer:
+    _EXPLANATIONS = (
+        "Multiple inheritance: AIModel inherits from Logging and BaseModel.",
+        "Subclasses override load() and predict() from BaseModel.",
+        "Polymorphism: predict() works differently in each subclass.",
+        "Encapsulation: ModelInfo hides data in a private dict.",
+        "Decorators add extra behavior to functions.",
+    )
+
     def _explain_multiple_inheritance(self):
-        return "Multiple inheritance: AIModel inherits from Logging and BaseModel."
+        return self._EXPLANATIONS[0]
 
     def _explain_method_overriding(self):
-        return "Subclasses override load() and predict() from BaseModel."
+        return self._EXPLANATIONS[1]
 
     def _explain_polymorphism(self):
-        return "Polymorphism: predict() works differently in each subclass."
+        return self._EXPLANATIONS[2]
 
     def _explain_encapsulation(self):
-        return "Encapsulation: ModelInfo hides data in a private dict."
+        return self._EXPLANATIONS[3]
 
     def _explain_multiple_decorators(self):
-        return "Decorators add extra behavior to functions."
+        return self._EXPLANATIONS[4]
 
     def get_explanations(self):
-        return "\n\n".join([
-            self._explain_multiple_inheritance(),
-            self._explain_method_overriding(),
-            self._explain_polymorphism(),
-            self._explain_encapsulation(),
-            self._explain_multiple_decorators()
-        ])
+        return "\n\n".join(self._EXPLANATIONS)
+
+OOP_EXPLANATIONS = OOPExplainer().get_explanations()